@@ -130,8 +130,10 @@ export async function getTrackerStatsForDate(date: string): Promise<ActivityStat
     LIMIT 3
   `).all(startOfDay, endOfDay) as any[];
 
+  // Rows merge repeated visits to a window within a minute, so sessions are
+  // counted from visits rather than rows
   const avgResult = db.prepare(`
-    SELECT AVG(duration) as avg_duration, COUNT(*) as session_count
+    SELECT SUM(duration) * 1.0 / SUM(visits) as avg_duration, SUM(visits) as session_count
     FROM activity_log
     WHERE timestamp >= ? AND timestamp <= ?
   `).get(startOfDay, endOfDay) as any;
@@ -233,6 +235,9 @@ export async function getTrackerHourlyActivityForDate(date: string): Promise<Hou
 
   const idleHourlyMap = new Map<string, number>();
 
+  // A row can merge several visits to the same window, all starting within
+  // its minute, so spreading its duration from the first visit's start shifts
+  // time by less than a minute at most
   for (const row of results) {
     const durationSeconds = typeof row.duration === 'number' ? row.duration : 0;
     if (!row.timestamp || durationSeconds <= 0) {
@@ -412,8 +417,10 @@ export async function getTrackerStats(): Promise<ActivityStats> {
     LIMIT 3
   `).all() as any[];
 
+  // Rows merge repeated visits to a window within a minute, so sessions are
+  // counted from visits rather than rows
   const avgResult = db.prepare(`
-    SELECT AVG(duration) as avg_duration, COUNT(*) as session_count
+    SELECT SUM(duration) * 1.0 / SUM(visits) as avg_duration, SUM(visits) as session_count
     FROM activity_log
     WHERE date(timestamp) = date('now')
   `).get() as any;
@@ -7,7 +7,8 @@ export const activityLog = sqliteTable('activity_log', {
   appName: text('app_name').notNull(),
   windowTitle: text('window_title').notNull(),
   duration: integer('duration').notNull(), // seconds
-  createdAt: text('created_at'),
+  minuteBucket: text('minute_bucket'), // ISO minute, rows for the same window are merged per minute
+  visits: integer('visits').notNull(), // number of separate visits merged into this row
 });
 
 // Input metrics from Python tracker
@@ -17,14 +18,12 @@ export const inputMetrics = sqliteTable('input_metrics', {
   keyPresses: integer('key_presses').notNull(),
   mouseClicks: integer('mouse_clicks').notNull(),
   mouseDistance: integer('mouse_distance').notNull(), // pixels
-  createdAt: text('created_at'),
 });
 
 // Idle periods from Python tracker
 export const idlePeriods = sqliteTable('idle_periods', {
   id: integer('id').primaryKey({ autoIncrement: true }),
   startTime: text('start_time').notNull(), // ISO format
-  endTime: text('end_time'), // nullable until idle ends
-  duration: integer('duration'), // seconds, nullable until idle ends
-  createdAt: text('created_at'),
+  endTime: text('end_time'), // null only in open periods left by older tracker versions
+  duration: integer('duration'), // seconds, null only in open periods left by older tracker versions
 });
@@ -3,40 +3,159 @@ Activity Tracker - Single-file Windows activity monitoring tool
 Tracks active windows, keyboard/mouse input, controller input, and idle periods.
 Database stored in: %USERPROFILE%\Documents\activity-tracker\tracker.db
 
-Requirements: pip install pywin32 psutil pynput inputs
+Requirements: pip install pynput
 """
+import ctypes
+import ctypes.wintypes as wintypes
+import math
+import os
 import sqlite3
+import queue
 import time
 import signal
 import sys
 import threading
+from contextlib import contextmanager
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
-from dataclasses import dataclass
-
-# Windows API imports
-import win32gui
-import win32process
-import psutil
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
 # Input tracking imports
 from pynput import keyboard, mouse
 
-# Controller tracking imports
-try:
-    from inputs import get_gamepad
-    CONTROLLER_AVAILABLE = True
-except ImportError:
-    CONTROLLER_AVAILABLE = False
+# Controller tracking via XInput
+XUSER_MAX_COUNT = 4
+ERROR_SUCCESS = 0
+XINPUT_GAMEPAD_LEFT_THUMB_DEADZONE = 7849
+XINPUT_GAMEPAD_RIGHT_THUMB_DEADZONE = 8689
+XINPUT_GAMEPAD_TRIGGER_THRESHOLD = 30
+
+
+class XINPUT_GAMEPAD(ctypes.Structure):
+    _fields_ = [
+        ("wButtons", ctypes.c_ushort),
+        ("bLeftTrigger", ctypes.c_ubyte),
+        ("bRightTrigger", ctypes.c_ubyte),
+        ("sThumbLX", ctypes.c_short),
+        ("sThumbLY", ctypes.c_short),
+        ("sThumbRX", ctypes.c_short),
+        ("sThumbRY", ctypes.c_short),
+    ]
+
+
+class XINPUT_STATE(ctypes.Structure):
+    _fields_ = [
+        ("dwPacketNumber", ctypes.c_ulong),
+        ("Gamepad", XINPUT_GAMEPAD),
+    ]
+
+
+def _load_xinput():
+    """Load the newest available XInput DLL, or None if there is none."""
+    for name in ("xinput1_4", "xinput1_3", "xinput9_1_0"):
+        try:
+            return ctypes.WinDLL(name)
+        except OSError:
+            continue
+    return None
+
+
+# ============================================================================
+# WINDOWS API
+# ============================================================================
+
+# Private DLL instances, so the prototypes declared below don't change the
+# shared ctypes.windll functions that pynput also calls
+_user32 = ctypes.WinDLL("user32")
+_kernel32 = ctypes.WinDLL("kernel32")
+
+WinEventProcType = ctypes.WINFUNCTYPE(
+    None,
+    wintypes.HANDLE,  # hWinEventHook
+    wintypes.DWORD,   # event
+    wintypes.HWND,    # hwnd
+    wintypes.LONG,    # idObject
+    wintypes.LONG,    # idChild
+    wintypes.DWORD,   # dwEventThread
+    wintypes.DWORD,   # dwmsEventTime
+)
+
+
+class LASTINPUTINFO(ctypes.Structure):
+    _fields_ = [
+        ("cbSize", ctypes.c_uint),
+        ("dwTime", ctypes.c_ulong),
+    ]
+
+
+_user32.SetWinEventHook.restype = wintypes.HANDLE
+_user32.SetWinEventHook.argtypes = [
+    wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProcType,
+    wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+]
+_user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+_user32.GetMessageW.argtypes = [wintypes.LPMSG, wintypes.HWND, wintypes.UINT, wintypes.UINT]
+_user32.TranslateMessage.argtypes = [wintypes.LPMSG]
+_user32.DispatchMessageW.argtypes = [wintypes.LPMSG]
+_user32.PostThreadMessageW.argtypes = [
+    wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM,
+]
+_user32.GetForegroundWindow.restype = wintypes.HWND
+_user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+_user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+_user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, wintypes.LPDWORD]
+_user32.GetLastInputInfo.argtypes = [ctypes.POINTER(LASTINPUTINFO)]
+_kernel32.GetCurrentThreadId.restype = wintypes.DWORD
+_kernel32.GetTickCount.restype = wintypes.DWORD
+_kernel32.OpenProcess.restype = wintypes.HANDLE
+_kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+_kernel32.QueryFullProcessImageNameW.argtypes = [
+    wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, wintypes.LPDWORD,
+]
+_kernel32.GetProcessTimes.argtypes = [
+    wintypes.HANDLE, wintypes.LPFILETIME, wintypes.LPFILETIME,
+    wintypes.LPFILETIME, wintypes.LPFILETIME,
+]
+_kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
 
 
 # ============================================================================
 # DATABASE
 # ============================================================================
 
+# Rows for the same window within the same minute (the first 16 characters
+# of the ISO timestamp) are merged by adding up their durations and counting
+# the merged visits
+_INSERT_ACTIVITY = """INSERT INTO activity_log (timestamp, app_name, window_title, duration, minute_bucket)
+                      VALUES (?1, ?2, ?3, ?4, substr(?1, 1, 16))
+                      ON CONFLICT (minute_bucket, app_name, window_title)
+                      DO UPDATE SET duration = duration + excluded.duration, visits = visits + 1"""
+_INSERT_INPUT_METRICS = """INSERT INTO input_metrics (timestamp, key_presses, mouse_clicks, mouse_distance)
+                           VALUES (?, ?, ?, ?)"""
+_INSERT_IDLE_PERIOD = """INSERT INTO idle_periods (start_time, end_time, duration)
+                         VALUES (?, ?, ?)"""
+
+# Statement used for each kind of queued write
+_WRITE_SQL = {
+    "activity": _INSERT_ACTIVITY,
+    "input_metrics": _INSERT_INPUT_METRICS,
+    "idle_period": _INSERT_IDLE_PERIOD,
+}
+
+
 class Database:
-    """Manages SQLite database for activity tracking."""
+    """Manages SQLite database for activity tracking.
+
+    Writes are queued and applied by a background writer thread so the
+    tracking loop never waits on disk I/O.
+    """
+
+    FLUSH_INTERVAL = 5  # Commit queued writes at most every 5 seconds
+    WRITE_BATCH_SIZE = 500  # Maximum writes per transaction
+    WRITE_QUEUE_SIZE = 10000  # Bound on pending writes; further writes are dropped
+    WRITE_ATTEMPTS = 3  # Tries for a batch while another connection holds the write lock
+    LOCK_TIMEOUT = 5  # Seconds each write waits for another connection's write lock
 
     def __init__(self, db_path: Optional[str] = None):
         """Initialize database connection.
@@ -52,10 +171,40 @@ class Database:
         self.conn = None
         self._initialize()
 
+        self._write_q = queue.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self._dropped_writes = 0
+        self._writer_thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer_thread.start()
+
+        # Formatted whole second reused by now_iso
+        self._last_sec: Optional[int] = None
+        self._last_iso_prefix = ''
+
     def _initialize(self):
         """Create database connection and tables if they don't exist."""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        # isolation_level=None disables the driver's implicit transactions so
+        # that writes can be grouped with explicit BEGIN IMMEDIATE / COMMIT.
+        # Under WAL readers never block the writer, so the timeout only
+        # matters when another connection is writing or checkpointing.
+        self.conn = sqlite3.connect(
+            self.db_path, timeout=self.LOCK_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+
+        # The page size can only be set before the first table is created
+        # (and, once in WAL mode, not changed at all)
+        if self.conn.execute("SELECT count(*) FROM sqlite_master").fetchone()[0] == 0:
+            self.conn.execute("PRAGMA page_size=4096")
+
+        # WAL with synchronous=NORMAL avoids an fsync on every commit
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA journal_size_limit=6144000")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA cache_size=-20000")
+        # Read pages through a memory map instead of read() calls
+        self.conn.execute("PRAGMA mmap_size=67108864")
+        # Checkpoints run inside COMMIT on the writer thread, off the poll loop
+        self.conn.execute("PRAGMA wal_autocheckpoint=1000")
 
         self.conn.executescript("""
             CREATE TABLE IF NOT EXISTS activity_log (
@@ -64,7 +213,8 @@ class Database:
                 app_name TEXT NOT NULL,
                 window_title TEXT NOT NULL,
                 duration INTEGER NOT NULL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                minute_bucket TEXT,
+                visits INTEGER NOT NULL DEFAULT 1
             );
 
             CREATE TABLE IF NOT EXISTS input_metrics (
@@ -72,27 +222,142 @@ class Database:
                 timestamp TEXT NOT NULL,
                 key_presses INTEGER DEFAULT 0,
                 mouse_clicks INTEGER DEFAULT 0,
-                mouse_distance INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                mouse_distance INTEGER DEFAULT 0
             );
 
             CREATE TABLE IF NOT EXISTS idle_periods (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 start_time TEXT NOT NULL,
                 end_time TEXT,
-                duration INTEGER,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                duration INTEGER
             );
 
             CREATE INDEX IF NOT EXISTS idx_activity_timestamp ON activity_log(timestamp);
+            CREATE INDEX IF NOT EXISTS idx_activity_app_ts ON activity_log(app_name, timestamp);
             CREATE INDEX IF NOT EXISTS idx_input_timestamp ON input_metrics(timestamp);
-            CREATE INDEX IF NOT EXISTS idx_idle_start ON idle_periods(start_time);
+            CREATE INDEX IF NOT EXISTS idx_idle_start_end ON idle_periods(start_time, end_time);
         """)
 
-        self.conn.commit()
+        # Databases created before minute buckets existed get the columns
+        # added; their old rows keep a NULL bucket, are never merged and
+        # count as one visit each
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(activity_log)")]
+        if "minute_bucket" not in columns:
+            self.conn.execute("ALTER TABLE activity_log ADD COLUMN minute_bucket TEXT")
+        if "visits" not in columns:
+            self.conn.execute("ALTER TABLE activity_log ADD COLUMN visits INTEGER NOT NULL DEFAULT 1")
+
+        self.conn.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_activity_bucket
+            ON activity_log(minute_bucket, app_name, window_title)
+        """)
+
+        # Superseded by idx_idle_start_end
+        self.conn.execute("DROP INDEX IF EXISTS idx_idle_start")
+
+        # Refresh planner statistics so the composite indexes get used;
+        # analysis_limit keeps this cheap on large databases
+        self.conn.execute("PRAGMA analysis_limit=1000")
+        self.conn.execute("ANALYZE")
+
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed writes in a single explicit transaction."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.conn
+            self.conn.execute("COMMIT")
+        except Exception:
+            # Also covers a failed COMMIT, which leaves the transaction open
+            if self.conn.in_transaction:
+                self.conn.execute("ROLLBACK")
+            raise
+
+    def _writer_loop(self):
+        """Background thread that drains queued writes in batched transactions."""
+        running = True
+        while running:
+            item = self._write_q.get()
+            if item is None:
+                break
+
+            # Collect whatever else arrives within the flush interval
+            batch = [item]
+            deadline = time.monotonic() + self.FLUSH_INTERVAL
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._write_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                # Keep the writer alive so the queue keeps draining
+                print(f"Database write failed, dropped {len(batch)} rows: {e}")
+
+    def _write_batch(self, batch: List[tuple]):
+        """Apply queued writes in one transaction, retrying while the database is locked.
+
+        Args:
+            batch: Queued writes as (kind, params) tuples
+        """
+        for attempt in range(self.WRITE_ATTEMPTS):
+            try:
+                with self._transaction() as conn:
+                    # Group consecutive writes of the same kind so each run
+                    # reuses one prepared statement while preserving order
+                    for kind, items in groupby(batch, key=itemgetter(0)):
+                        self._execute_writes(conn, kind, [params for _, params in items])
+                return
+            except sqlite3.OperationalError as e:
+                # The connection timeout has already waited for the lock, but
+                # the batch is worth another try before it is dropped
+                if "locked" not in str(e) or attempt == self.WRITE_ATTEMPTS - 1:
+                    raise
+
+    def _execute_writes(self, conn: sqlite3.Connection, kind: str, rows: List[tuple]):
+        """Execute a run of queued writes of the same kind.
+
+        Args:
+            conn: Connection with an open transaction
+            kind: Type of queued write
+            rows: Statement parameters, one tuple per row
+        """
+        conn.executemany(_WRITE_SQL[kind], rows)
+
+    def now_iso(self, t: Optional[float] = None) -> str:
+        """Format a Unix time as a local ISO timestamp with microseconds.
+
+        Most calls fall in the same second as the previous one, so the
+        formatted date and time up to the second is cached.
+
+        Args:
+            t: Unix time, defaults to the current time
+
+        Returns:
+            Timestamp like datetime.isoformat(), always with microseconds
+        """
+        if t is None:
+            t = time.time()
+        sec = int(t)
+        if sec != self._last_sec:
+            self._last_iso_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(sec))
+            self._last_sec = sec
+        return f"{self._last_iso_prefix}.{int((t - sec) * 1e6):06d}"
 
     def log_activity(self, timestamp: str, app_name: str, window_title: str, duration: int):
-        """Log active window activity.
+        """Queue active window activity for logging.
+
+        Activity for the same window starting within the same minute is
+        merged into one row.
 
         Args:
             timestamp: ISO format timestamp
@@ -100,15 +365,10 @@ class Database:
             window_title: Window title text
             duration: Duration in seconds
         """
-        self.conn.execute(
-            """INSERT INTO activity_log (timestamp, app_name, window_title, duration)
-               VALUES (?, ?, ?, ?)""",
-            (timestamp, app_name, window_title, duration)
-        )
-        self.conn.commit()
+        self._enqueue(("activity", (timestamp, app_name, window_title, duration)))
 
     def log_input_metrics(self, timestamp: str, key_presses: int, mouse_clicks: int, mouse_distance: int):
-        """Log input metrics for a time period.
+        """Queue input metrics for a time period for logging.
 
         Args:
             timestamp: ISO format timestamp
@@ -116,45 +376,39 @@ class Database:
             mouse_clicks: Number of mouse clicks
             mouse_distance: Mouse movement distance in pixels
         """
-        self.conn.execute(
-            """INSERT INTO input_metrics (timestamp, key_presses, mouse_clicks, mouse_distance)
-               VALUES (?, ?, ?, ?)""",
-            (timestamp, key_presses, mouse_clicks, mouse_distance)
-        )
-        self.conn.commit()
+        self._enqueue(("input_metrics", (timestamp, key_presses, mouse_clicks, mouse_distance)))
 
-    def start_idle_period(self, start_time: str) -> int:
-        """Record start of idle period.
+    def log_idle_period(self, start_time: str, end_time: str, duration: int):
+        """Queue a completed idle period for logging.
 
         Args:
             start_time: ISO format timestamp
-
-        Returns:
-            Row ID of the idle period
+            end_time: ISO format timestamp
+            duration: Duration in seconds
         """
-        cursor = self.conn.execute(
-            "INSERT INTO idle_periods (start_time) VALUES (?)",
-            (start_time,)
-        )
-        self.conn.commit()
-        return cursor.lastrowid
+        self._enqueue(("idle_period", (start_time, end_time, duration)))
 
-    def end_idle_period(self, idle_id: int, end_time: str, duration: int):
-        """Record end of idle period.
+    def _enqueue(self, item: tuple):
+        """Queue a write for the writer thread without ever blocking.
 
         Args:
-            idle_id: Row ID of the idle period
-            end_time: ISO format timestamp
-            duration: Duration in seconds
+            item: Queued write as a (kind, params) tuple
         """
-        self.conn.execute(
-            "UPDATE idle_periods SET end_time = ?, duration = ? WHERE id = ?",
-            (end_time, duration, idle_id)
-        )
-        self.conn.commit()
+        try:
+            self._write_q.put_nowait(item)
+        except queue.Full:
+            # The writer is stalled or gone; losing rows beats stalling tracking
+            if not self._dropped_writes:
+                print("Write queue is full, dropping writes")
+            self._dropped_writes += 1
 
     def close(self):
-        """Close database connection."""
+        """Flush queued writes and close database connection."""
+        if self._writer_thread.is_alive():
+            self._write_q.put(None)
+            self._writer_thread.join()
+        if self._dropped_writes:
+            print(f"Dropped {self._dropped_writes} writes while the write queue was full")
         if self.conn:
             self.conn.close()
 
@@ -163,51 +417,265 @@ class Database:
 # WINDOW TRACKER
 # ============================================================================
 
-@dataclass
-class WindowInfo:
+# Window event hooks
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+CHILDID_SELF = 0
+WM_QUIT = 0x0012
+
+# Window and process lookups
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+WINDOW_TITLE_LENGTH = 512
+IMAGE_PATH_LENGTH = 32768
+
+
+class WindowInfo(NamedTuple):
     """Information about the active window."""
     app_name: str
     window_title: str
 
 
 class WindowTracker:
-    """Tracks the currently active window on Windows."""
+    """Tracks the currently active window on Windows.
+
+    Foreground and title changes are pushed by SetWinEventHook callbacks
+    running on a dedicated message-loop thread, which looks up the new
+    window as soon as it changes. get_active_window only checks that the
+    foreground window is still the one last pushed, since some changes
+    (e.g. to the secure desktop on lock) raise no event.
+    """
+
+    PID_CACHE_SIZE = 256  # Clear the process name cache beyond this many PIDs
+    HWND_CACHE_SIZE = 256  # Clear the window cache beyond this many HWNDs
 
     def __init__(self):
         self._last_window: Optional[WindowInfo] = None
+        self._pid_name_cache: Dict[int, Tuple[int, str]] = {}  # pid -> (create_time, name)
+        self._hwnd_info: Dict[int, Tuple[int, WindowInfo]] = {}  # hwnd -> (pid, window)
+
+        # Window event hooks
+        self._foreground_hwnd = None
+        self._foreground_window: Optional[WindowInfo] = None
+        self._name_hook = None
+        self._name_hook_pid = None
+        self._hook_active = False
+        self._hook_thread = None
+        self._hook_thread_id = None
+        self._hook_ready = threading.Event()
+        self._foreground_changed = threading.Event()
+        self._win_event_proc = WinEventProcType(self._on_win_event)
+
+    def start(self):
+        """Start listening for foreground window changes."""
+        self._foreground_hwnd = _user32.GetForegroundWindow()
+        self._hook_thread = threading.Thread(target=self._hook_loop, daemon=True)
+        self._hook_thread.start()
+        self._hook_ready.wait(timeout=1)
+
+    def stop(self):
+        """Stop listening for foreground window changes."""
+        if self._hook_thread_id is not None:
+            _user32.PostThreadMessageW(self._hook_thread_id, WM_QUIT, 0, 0)
+        if self._hook_thread:
+            self._hook_thread.join(timeout=1)
+
+    def _hook_loop(self):
+        """Background thread owning the event hook and its message loop."""
+        self._hook_thread_id = _kernel32.GetCurrentThreadId()
+        hook = _user32.SetWinEventHook(
+            EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, None,
+            self._win_event_proc, 0, 0, WINEVENT_OUTOFCONTEXT
+        )
+        if not hook:
+            print("Failed to install foreground window hook, falling back to polling")
+            self._hook_ready.set()
+            return
+
+        self._watch_title_changes(self._foreground_hwnd)
+        self._foreground_window = self._lookup_window(self._foreground_hwnd)
+        self._hook_active = True
+        self._hook_ready.set()
+
+        # Out-of-context hook callbacks are delivered while this thread waits
+        # in GetMessage
+        msg = wintypes.MSG()
+        while _user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            _user32.TranslateMessage(ctypes.byref(msg))
+            _user32.DispatchMessageW(ctypes.byref(msg))
+
+        if self._name_hook:
+            _user32.UnhookWinEvent(self._name_hook)
+        _user32.UnhookWinEvent(hook)
+        self._hook_active = False
+
+    def _watch_title_changes(self, hwnd):
+        """Hook name changes of the process owning the foreground window.
+
+        Name change events are frequent system-wide, so the hook is limited
+        to the foreground process and moved whenever that changes. Must be
+        called on the hook thread.
+
+        Args:
+            hwnd: Foreground window handle
+        """
+        if not hwnd:
+            return
+        pid = self._get_window_pid(hwnd)
+        # PID 0 would hook every process
+        if not pid or (pid == self._name_hook_pid and self._name_hook):
+            return
+
+        if self._name_hook:
+            _user32.UnhookWinEvent(self._name_hook)
+        self._name_hook = _user32.SetWinEventHook(
+            EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE, None,
+            self._win_event_proc, pid, 0, WINEVENT_OUTOFCONTEXT
+        )
+        self._name_hook_pid = pid
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        """Handle a window event pushed by one of the event hooks."""
+        if event == EVENT_SYSTEM_FOREGROUND:
+            if hwnd:
+                self._foreground_hwnd = hwnd
+                self._watch_title_changes(hwnd)
+                self._foreground_window = self._lookup_window(hwnd)
+                self._foreground_changed.set()
+        elif id_object != OBJID_WINDOW or id_child != CHILDID_SELF:
+            # Events about controls or other objects inside a window
+            return
+        elif event == EVENT_OBJECT_NAMECHANGE:
+            if hwnd == self._foreground_hwnd:
+                self._foreground_window = self._lookup_window(hwnd)
+
+    def wait_for_change(self, timeout: float):
+        """Wait until the hooks push a foreground window change.
+
+        Title changes don't wake the caller, so a clock in a window title
+        can't keep an idle poll loop busy.
+
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        self._foreground_changed.wait(timeout)
+        self._foreground_changed.clear()
 
     def get_active_window(self) -> Optional[WindowInfo]:
         """Get information about the currently active window.
 
+        Returns:
+            WindowInfo object or None if unable to get window info
+        """
+        # NULL while the secure desktop (lock screen, UAC) is in front
+        hwnd = _user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+
+        # Kept up to date by the hook thread
+        if self._hook_active and self._name_hook and hwnd == self._foreground_hwnd:
+            return self._foreground_window
+
+        # Without hooks, or for a change the hooks missed, look the window up
+        return self._lookup_window(hwnd)
+
+    def _lookup_window(self, hwnd) -> Optional[WindowInfo]:
+        """Get information about a window.
+
+        Args:
+            hwnd: Window handle
+
         Returns:
             WindowInfo object or None if unable to get window info
         """
         try:
-            hwnd = win32gui.GetForegroundWindow()
             if not hwnd:
                 return None
 
             # Get window title
-            window_title = win32gui.GetWindowText(hwnd)
-            if not window_title:
+            # Buffers are allocated per call because lookups can run on both
+            # the hook thread and the polling thread
+            buffer = ctypes.create_unicode_buffer(WINDOW_TITLE_LENGTH)
+            if not _user32.GetWindowTextW(hwnd, buffer, WINDOW_TITLE_LENGTH):
                 return None
+            window_title = buffer.value
 
-            # Get process ID
-            _, pid = win32process.GetWindowThreadProcessId(hwnd)
-
-            # Get process name
-            try:
-                process = psutil.Process(pid)
-                app_name = process.name()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                app_name = "Unknown"
+            # The owner is checked on every lookup because the HWND of a
+            # destroyed window can be reused by another process
+            pid = self._get_window_pid(hwnd)
+            if pid is None:
+                return None
 
-            return WindowInfo(app_name=app_name, window_title=window_title)
+            # A window seen before in the same process can only have changed
+            # its title (e.g. a browser tab), so skip the process lookup
+            cached = self._hwnd_info.get(hwnd)
+            if cached is not None and cached[0] == pid:
+                if window_title == cached[1].window_title:
+                    return cached[1]
+                app_name = cached[1].app_name
+            else:
+                app_name = self._get_process_name(pid)
+                if len(self._hwnd_info) >= self.HWND_CACHE_SIZE:
+                    self._hwnd_info.clear()
+
+            window = WindowInfo(app_name=app_name, window_title=window_title)
+            self._hwnd_info[hwnd] = (pid, window)
+            return window
 
         except Exception:
             # Silently fail - some windows may be inaccessible
             return None
 
+    def _get_window_pid(self, hwnd) -> Optional[int]:
+        """Get the ID of the process owning a window, or None if the window is gone."""
+        pid = wintypes.DWORD()
+        if not _user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid)):
+            return None
+        return pid.value
+
+    def _get_process_name(self, pid: int) -> str:
+        """Get the executable name of a process, cached per PID.
+
+        The process creation time guards against a PID having been reused by
+        a different process since it was cached.
+
+        Args:
+            pid: Process ID
+
+        Returns:
+            Executable name, or "Unknown" if the process can't be queried
+        """
+        handle = _kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            self._pid_name_cache.pop(pid, None)
+            return "Unknown"
+
+        try:
+            created = wintypes.FILETIME()
+            unused = ctypes.byref(wintypes.FILETIME())
+            if not _kernel32.GetProcessTimes(handle, ctypes.byref(created), unused, unused, unused):
+                return "Unknown"
+            create_time = (created.dwHighDateTime << 32) | created.dwLowDateTime
+            cached = self._pid_name_cache.get(pid)
+            if cached is not None and cached[0] == create_time:
+                return cached[1]
+
+            path = ctypes.create_unicode_buffer(IMAGE_PATH_LENGTH)
+            path_length = wintypes.DWORD(IMAGE_PATH_LENGTH)
+            if not _kernel32.QueryFullProcessImageNameW(handle, 0, path, ctypes.byref(path_length)):
+                return "Unknown"
+            # The same few executable names recur constantly; interning makes
+            # them share one object so comparisons hit the identity fast path
+            app_name = sys.intern(os.path.basename(path.value))
+        finally:
+            _kernel32.CloseHandle(handle)
+
+        if len(self._pid_name_cache) >= self.PID_CACHE_SIZE:
+            self._pid_name_cache.clear()
+        self._pid_name_cache[pid] = (create_time, app_name)
+        return app_name
+
     def has_window_changed(self, current: Optional[WindowInfo]) -> bool:
         """Check if the active window has changed.
 
@@ -217,18 +685,8 @@ class WindowTracker:
         Returns:
             True if window changed, False otherwise
         """
-        if current is None and self._last_window is None:
-            return False
-
-        if current is None or self._last_window is None:
-            return True
-
-        changed = (
-            current.app_name != self._last_window.app_name
-            or current.window_title != self._last_window.window_title
-        )
-
-        return changed
+        # Unchanged windows usually come back as the same cached object
+        return current is not self._last_window and current != self._last_window
 
     def update_last_window(self, window: Optional[WindowInfo]):
         """Update the last known window.
@@ -243,26 +701,57 @@ class WindowTracker:
 # INPUT TRACKER
 # ============================================================================
 
+def _is_gamepad_active(pad: XINPUT_GAMEPAD) -> bool:
+    """Check whether any button is held or any stick/trigger is deflected."""
+    return (
+        pad.wButtons != 0
+        or pad.bLeftTrigger > XINPUT_GAMEPAD_TRIGGER_THRESHOLD
+        or pad.bRightTrigger > XINPUT_GAMEPAD_TRIGGER_THRESHOLD
+        or abs(pad.sThumbLX) > XINPUT_GAMEPAD_LEFT_THUMB_DEADZONE
+        or abs(pad.sThumbLY) > XINPUT_GAMEPAD_LEFT_THUMB_DEADZONE
+        or abs(pad.sThumbRX) > XINPUT_GAMEPAD_RIGHT_THUMB_DEADZONE
+        or abs(pad.sThumbRY) > XINPUT_GAMEPAD_RIGHT_THUMB_DEADZONE
+    )
+
+
 class InputTracker:
     """Tracks keyboard and mouse input metrics."""
 
+    CONTROLLER_POLL_INTERVAL = 0.1  # Poll connected controllers at 10 Hz
+    CONTROLLER_PROBE_INTERVAL = 5  # Check empty controller slots every 5 seconds
+    MOUSE_COALESCE_PIXELS = 32  # Fold mouse moves together until they span this far
+    MOUSE_COALESCE_INTERVAL = 0.05  # ...or until this many seconds have passed
+
     def __init__(self):
+        # Running totals that only ever grow. Each one is written by a single
+        # listener thread and get_metrics_and_reset reports the difference
+        # from its previous snapshot, so no lock is needed on either side.
         self._key_presses = 0
         self._mouse_clicks = 0
-        self._mouse_distance = 0
-        self._last_mouse_pos = None
-        self._last_activity_time = time.time()
-        self._lock = threading.Lock()
+        self._mouse_distance = 0.0  # Truncated to whole pixels when reported
+        self._reported_totals = (0, 0, 0)
+        self._last_mouse_pos = None  # Position at the last distance update
+        self._last_mouse_update = 0.0
+        # Last controller activity (monotonic). A single float
+        # attribute store is atomic, so it needs no lock either.
+        self._last_activity_time = time.monotonic()
+        self._last_input_info = LASTINPUTINFO(cbSize=ctypes.sizeof(LASTINPUTINFO))
+        self._last_input_info_ref = ctypes.byref(self._last_input_info)
+        # Resolved once instead of through the DLL on every poll
+        self._get_last_input_info = _user32.GetLastInputInfo
+        self._get_tick_count = _kernel32.GetTickCount
 
         # Listeners
         self._keyboard_listener = None
         self._mouse_listener = None
         self._controller_thread = None
         self._running = False
+        self._stopped = threading.Event()  # Wakes the controller thread on stop
 
     def start(self):
         """Start tracking keyboard, mouse, and controller input."""
         self._running = True
+        self._stopped.clear()
 
         # Keyboard listener
         self._keyboard_listener = keyboard.Listener(
@@ -277,14 +766,18 @@ class InputTracker:
         )
         self._mouse_listener.start()
 
-        # Controller listener (if available)
-        if CONTROLLER_AVAILABLE:
-            self._controller_thread = threading.Thread(target=self._controller_loop, daemon=True)
+        # Controller listener (if XInput is available)
+        xinput = _load_xinput()
+        if xinput is not None:
+            self._controller_thread = threading.Thread(
+                target=self._controller_loop, args=(xinput,), daemon=True
+            )
             self._controller_thread.start()
 
     def stop(self):
         """Stop tracking input."""
         self._running = False
+        self._stopped.set()
         if self._keyboard_listener:
             self._keyboard_listener.stop()
         if self._mouse_listener:
@@ -292,47 +785,78 @@ class InputTracker:
         if self._controller_thread:
             self._controller_thread.join(timeout=1)
 
-    def _controller_loop(self):
-        """Background thread to monitor controller input."""
+    def _controller_loop(self, xinput: ctypes.WinDLL):
+        """Background thread to monitor controller input.
+
+        Args:
+            xinput: Loaded XInput library
+        """
         print("Controller tracking started")
+        get_state = xinput.XInputGetState
+        state = XINPUT_STATE()
+        last_packets = [None] * XUSER_MAX_COUNT
+        next_probe = 0.0
+
         while self._running:
-            try:
-                events = get_gamepad()
-                for event in events:
-                    # Any controller event counts as activity
-                    # event.code contains button/stick identifiers
-                    # event.state contains the value (pressed/released/analog value)
-                    if event.state != 0:  # Ignore button releases and neutral positions
-                        with self._lock:
-                            self._last_activity_time = time.time()
-            except Exception:
-                # No controller connected or other error - wait and retry
-                time.sleep(1)
+            # Querying an empty slot is comparatively slow, so slots without a
+            # controller are only probed every CONTROLLER_PROBE_INTERVAL
+            probe = time.monotonic() >= next_probe
+            if probe:
+                next_probe = time.monotonic() + self.CONTROLLER_PROBE_INTERVAL
+
+            for user_index in range(XUSER_MAX_COUNT):
+                if last_packets[user_index] is None and not probe:
+                    continue
+                if get_state(user_index, ctypes.byref(state)) != ERROR_SUCCESS:
+                    # Controller not connected
+                    last_packets[user_index] = None
+                    continue
+
+                # The packet number only changes when the controller state does
+                if state.dwPacketNumber == last_packets[user_index]:
+                    continue
+                last_packets[user_index] = state.dwPacketNumber
+
+                # Ignore button releases and sticks resting in their dead zone
+                if _is_gamepad_active(state.Gamepad):
+                    self._last_activity_time = time.monotonic()
+
+            # With no controller connected there is nothing to poll until the
+            # next probe for a newly plugged-in one
+            if any(packet is not None for packet in last_packets):
+                delay = self.CONTROLLER_POLL_INTERVAL
+            else:
+                delay = next_probe - time.monotonic()
+            self._stopped.wait(delay)
 
     def _on_key_press(self, key):
         """Handle keyboard press event."""
-        with self._lock:
-            self._key_presses += 1
-            self._last_activity_time = time.time()
+        self._key_presses += 1
 
     def _on_mouse_move(self, x, y):
-        """Handle mouse movement event."""
-        with self._lock:
-            if self._last_mouse_pos is not None:
-                dx = x - self._last_mouse_pos[0]
-                dy = y - self._last_mouse_pos[1]
-                distance = int((dx ** 2 + dy ** 2) ** 0.5)
-                self._mouse_distance += distance
+        """Handle mouse movement event.
 
-            self._last_mouse_pos = (x, y)
-            self._last_activity_time = time.time()
+        Moves are coalesced: distance is only added once the cursor is
+        MOUSE_COALESCE_PIXELS away from the last update or
+        MOUSE_COALESCE_INTERVAL has passed, measured as a straight segment.
+        """
+        now = time.monotonic()
+        anchor = self._last_mouse_pos
+        if anchor is not None:
+            dx = x - anchor[0]
+            dy = y - anchor[1]
+            if (abs(dx) + abs(dy) <= self.MOUSE_COALESCE_PIXELS
+                    and now - self._last_mouse_update <= self.MOUSE_COALESCE_INTERVAL):
+                return
+            self._mouse_distance += math.hypot(dx, dy)
+
+        self._last_mouse_pos = (x, y)
+        self._last_mouse_update = now
 
     def _on_mouse_click(self, x, y, button, pressed):
         """Handle mouse click event."""
         if pressed:
-            with self._lock:
-                self._mouse_clicks += 1
-                self._last_activity_time = time.time()
+            self._mouse_clicks += 1
 
     def get_metrics_and_reset(self) -> Tuple[int, int, int]:
         """Get current metrics and reset counters.
@@ -340,26 +864,29 @@ class InputTracker:
         Returns:
             Tuple of (key_presses, mouse_clicks, mouse_distance)
         """
-        with self._lock:
-            metrics = (self._key_presses, self._mouse_clicks, self._mouse_distance)
-            self._key_presses = 0
-            self._mouse_clicks = 0
-            self._mouse_distance = 0
-            return metrics
+        totals = (self._key_presses, self._mouse_clicks, int(self._mouse_distance))
+        reported = self._reported_totals
+        self._reported_totals = totals
+        return (
+            totals[0] - reported[0],
+            totals[1] - reported[1],
+            totals[2] - reported[2],
+        )
 
     def get_idle_seconds(self) -> float:
         """Get seconds since last input activity.
 
+        Keyboard and mouse idle time comes from the system-wide counter kept
+        by Windows, which does not include XInput controllers.
+
         Returns:
-            Seconds since last keyboard or mouse activity
+            Seconds since last keyboard, mouse or controller activity
         """
-        with self._lock:
-            return time.time() - self._last_activity_time
-
-    def reset_idle_timer(self):
-        """Reset the idle timer to current time."""
-        with self._lock:
-            self._last_activity_time = time.time()
+        self._get_last_input_info(self._last_input_info_ref)
+        # Both tick counts are 32-bit and wrap after ~49.7 days
+        idle_ms = (self._get_tick_count() - self._last_input_info.dwTime) & 0xFFFFFFFF
+        controller_idle = time.monotonic() - self._last_activity_time
+        return min(idle_ms / 1000, controller_idle)
 
 
 # ============================================================================
@@ -371,6 +898,7 @@ class ActivityTracker:
 
     # Constants
     POLL_INTERVAL = 1  # Poll every second
+    IDLE_POLL_INTERVAL = 10  # Poll less often while the user is idle
     LOG_INTERVAL = 60  # Log every 60 seconds
     IDLE_THRESHOLD = 180  # 3 minutes in seconds
 
@@ -387,11 +915,12 @@ class ActivityTracker:
         # State tracking
         self._running = False
         self._current_window: Optional[WindowInfo] = None
-        self._window_start_time: Optional[datetime] = None
-        self._last_log_time: Optional[datetime] = None
+        self._window_start_time: Optional[float] = None
+        self._window_start_mono: Optional[float] = None
+        self._last_log_time: Optional[float] = None
         self._is_idle = False
-        self._idle_period_id: Optional[int] = None
-        self._idle_start_time: Optional[datetime] = None
+        self._idle_start_time: Optional[float] = None
+        self._idle_start_mono: Optional[float] = None
 
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -406,11 +935,12 @@ class ActivityTracker:
         """Start the activity tracker daemon."""
         print("Starting activity tracker...")
         self._running = True
+        self.window_tracker.start()
         self.input_tracker.start()
 
         # Initialize to the start of the current minute
-        now = datetime.now()
-        self._last_log_time = now.replace(second=0, microsecond=0)
+        now = time.time()
+        self._last_log_time = now - now % 60
 
         try:
             self._run_loop()
@@ -428,10 +958,11 @@ class ActivityTracker:
         self._running = False
 
         # Log any remaining activity
-        self._log_current_window()
-        self._log_metrics()
+        self._log_current_window(time.monotonic())
+        self._log_metrics(time.time())
 
-        # Stop input tracking
+        # Stop window and input tracking
+        self.window_tracker.stop()
         self.input_tracker.stop()
 
         # Close database
@@ -441,94 +972,115 @@ class ActivityTracker:
 
     def _run_loop(self):
         """Main tracking loop."""
+        next_tick = time.monotonic()
         while self._running:
-            now = datetime.now()
+            # Wall-clock time for timestamps, monotonic time for durations
+            now = time.time()
+            mono = time.monotonic()
 
             # Get current window
             current_window = self.window_tracker.get_active_window()
 
             # Check if window changed
             if self.window_tracker.has_window_changed(current_window):
-                self._log_current_window()
+                self._log_current_window(mono)
                 self._current_window = current_window
                 self._window_start_time = now
+                self._window_start_mono = mono
                 self.window_tracker.update_last_window(current_window)
 
             # Check idle state
             idle_seconds = self.input_tracker.get_idle_seconds()
-            self._handle_idle_state(idle_seconds)
+            self._handle_idle_state(idle_seconds, now, mono)
 
             # Check if we've reached the next minute boundary
-            next_log_time = self._last_log_time + timedelta(seconds=self.LOG_INTERVAL)
-            if now >= next_log_time:
-                self._log_metrics()
+            if now >= self._last_log_time + self.LOG_INTERVAL:
+                self._log_metrics(now)
                 # Set to the exact minute boundary
-                self._last_log_time = now.replace(second=0, microsecond=0)
-
-            # Sleep until next poll
-            time.sleep(self.POLL_INTERVAL)
+                self._last_log_time = now - now % 60
+
+            # Sleep until the next tick, subtracting the time spent working so
+            # the loop doesn't drift; if we fell behind, restart from now. An
+            # early wake-up for a window switch (which can end an idle period
+            # mid-way through the long idle tick) keeps the schedule.
+            if mono >= next_tick:
+                next_tick += self.IDLE_POLL_INTERVAL if self._is_idle else self.POLL_INTERVAL
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                self.window_tracker.wait_for_change(delay)
+            else:
+                next_tick = time.monotonic()
+
+    def _log_current_window(self, mono: float):
+        """Log the current window activity to database.
 
-    def _log_current_window(self):
-        """Log the current window activity to database."""
+        Args:
+            mono: Monotonic time at which the current window stopped being active
+        """
         if self._current_window is None or self._window_start_time is None:
             return
 
         # Calculate duration
-        duration = int((datetime.now() - self._window_start_time).total_seconds())
+        duration = int(mono - self._window_start_mono)
 
         # Only log if duration > 0
         if duration > 0:
             self.db.log_activity(
-                timestamp=self._window_start_time.isoformat(),
+                timestamp=self.db.now_iso(self._window_start_time),
                 app_name=self._current_window.app_name,
                 window_title=self._current_window.window_title,
                 duration=duration
             )
 
-    def _log_metrics(self):
-        """Log input metrics to database."""
+    def _log_metrics(self, now: float):
+        """Log input metrics to database.
+
+        Args:
+            now: Time at which the metrics period ends
+        """
         key_presses, mouse_clicks, mouse_distance = self.input_tracker.get_metrics_and_reset()
 
         # Only log if there was any activity
         if key_presses > 0 or mouse_clicks > 0 or mouse_distance > 0:
             self.db.log_input_metrics(
-                timestamp=datetime.now().isoformat(),
+                timestamp=self.db.now_iso(now),
                 key_presses=key_presses,
                 mouse_clicks=mouse_clicks,
                 mouse_distance=mouse_distance
             )
 
-    def _handle_idle_state(self, idle_seconds: float):
+    def _handle_idle_state(self, idle_seconds: float, now: float, mono: float):
         """Handle idle state transitions.
 
         Args:
             idle_seconds: Seconds since last input activity
+            now: Time of the current poll
+            mono: Monotonic time of the current poll
         """
         # Transition to idle
         if not self._is_idle and idle_seconds >= self.IDLE_THRESHOLD:
             self._is_idle = True
-            self._idle_start_time = datetime.now() - timedelta(seconds=idle_seconds)
-            self._idle_period_id = self.db.start_idle_period(
-                start_time=self._idle_start_time.isoformat()
-            )
-            print(f"User became idle at {self._idle_start_time.strftime('%H:%M:%S')}")
+            self._idle_start_time = now - idle_seconds
+            self._idle_start_mono = mono - idle_seconds
+            print(f"User became idle at {time.strftime('%H:%M:%S', time.localtime(self._idle_start_time))}")
 
         # Transition from idle to active
         elif self._is_idle and idle_seconds < self.IDLE_THRESHOLD:
-            if self._idle_period_id is not None and self._idle_start_time is not None:
-                end_time = datetime.now()
-                duration = int((end_time - self._idle_start_time).total_seconds())
-                self.db.end_idle_period(
-                    idle_id=self._idle_period_id,
-                    end_time=end_time.isoformat(),
+            if self._idle_start_time is not None:
+                # Input resumed idle_seconds ago, possibly well before this
+                # (slower) idle tick noticed it
+                end_time = now - idle_seconds
+                duration = int(mono - idle_seconds - self._idle_start_mono)
+                self.db.log_idle_period(
+                    start_time=self.db.now_iso(self._idle_start_time),
+                    end_time=self.db.now_iso(end_time),
                     duration=duration
                 )
                 print(f"User became active again after {duration}s idle")
 
             self._is_idle = False
-            self._idle_period_id = None
             self._idle_start_time = None
-            self.input_tracker.reset_idle_timer()
+            self._idle_start_mono = None
 
 
 # ============================================================================